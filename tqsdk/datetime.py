@@ -52,8 +52,13 @@ def _get_trading_day_from_timestamp(timestamp):
 
 def _get_trading_timestamp(quote, current_datetime: str):
     """ 将 quote 在 current_datetime 所在交易日的所有可交易时间段转换为纳秒时间戳(tqsdk内部使用的时间戳统一为纳秒)并返回 """
+    return _get_trading_timestamp_by_nano(quote, _str_to_timestamp_nano(current_datetime))
+
+
+def _get_trading_timestamp_by_nano(quote, current_nano: int):
+    """ 同 _get_trading_timestamp, current_nano 为纳秒时间戳 """
     # 获取当前交易日时间戳
-    current_trading_day_timestamp = _get_trading_day_from_timestamp(_str_to_timestamp_nano(current_datetime))
+    current_trading_day_timestamp = _get_trading_day_from_timestamp(current_nano)
     # 获取上一交易日时间戳
     last_trading_day_timestamp = _get_trading_day_from_timestamp(
         _get_trading_day_start_time(current_trading_day_timestamp) - 1)
@@ -80,9 +85,14 @@ def _get_period_timestamp(real_date_timestamp, period_str):
 
 def _is_in_trading_time(quote, current_datetime, local_time_record):
     """ 判断是否在可交易时间段内，需在quote已收到行情后调用本函数"""
-    # 只在需要用到可交易时间段时(即本函数中)才调用_get_trading_timestamp()
-    trading_timestamp = _get_trading_timestamp(quote, current_datetime)
-    now_ns_timestamp = _get_trade_timestamp(current_datetime, local_time_record)  # 当前预估交易所纳秒时间戳
+    return _is_in_trading_time_by_nano(quote, _str_to_timestamp_nano(current_datetime), local_time_record)
+
+
+def _is_in_trading_time_by_nano(quote, current_nano, local_time_record):
+    """ 同 _is_in_trading_time, current_nano 为纳秒时间戳，避免重复解析时间字符串 """
+    # 只在需要用到可交易时间段时(即本函数中)才调用_get_trading_timestamp_by_nano()
+    trading_timestamp = _get_trading_timestamp_by_nano(quote, current_nano)
+    now_ns_timestamp = _get_trade_timestamp_by_nano(current_nano, local_time_record)  # 当前预估交易所纳秒时间戳
     # 判断当前交易所时间（估计值）是否在交易时间段内
     for v in trading_timestamp.values():
         for period in v:
@@ -94,7 +104,11 @@ def _is_in_trading_time(quote, current_datetime, local_time_record):
 def _get_trade_timestamp(current_datetime, local_time_record):
     # 根据最新行情时间获取模拟的(预估的)当前交易所纳秒时间戳（tqsdk内部使用的时间戳统一为纳秒）
     # 如果local_time_record为nan，則不加时间差
-    cur_nano = _str_to_timestamp_nano(current_datetime)
+    return _get_trade_timestamp_by_nano(_str_to_timestamp_nano(current_datetime), local_time_record)
+
+
+def _get_trade_timestamp_by_nano(cur_nano, local_time_record):
+    """ 同 _get_trade_timestamp, cur_nano 为最新行情时间的纳秒时间戳 """
     mock_delay_nano = 0 if local_time_record != local_time_record else int((time.time() - local_time_record) * 1e6) * 1000
     return cur_nano + mock_delay_nano
 
@@ -6,20 +6,46 @@ import asyncio
 import time
 from datetime import datetime
 from asyncio import gather
-from inspect import isfunction
 from typing import Optional, Union, Callable
 
 from tqsdk import utils
 from tqsdk.api import TqApi
 from tqsdk.backtest import TqBacktest
 from tqsdk.channel import TqChan
-from tqsdk.datetime import _is_in_trading_time, _timestamp_nano_to_str
+from tqsdk.datetime import _is_in_trading_time_by_nano, _str_to_timestamp_nano
 from tqsdk.diff import _get_obj
 from tqsdk.lib.utils import _check_volume_limit, _check_direction, _check_offset, _check_volume, _check_price, \
     _check_offset_priority
 from tqsdk.tradeable import TqAccount, TqKq, TqSim
 
 
+# 交易所规定最小开仓手数大于 1 手的品种，TargetPosTask 暂不支持
+_UNSUPPORTED_PRODUCTS = {
+    "CZCE.CJ": "红枣期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 4 手，这些函数还未支持该规则!",
+    "CZCE.ZC": "动力煤期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 4 手，这些函数还未支持该规则!",
+    "CZCE.WH": "强麦期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!",
+    "CZCE.PM": "普麦期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!",
+    "CZCE.RI": "早籼稻期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!",
+    "CZCE.JR": "粳稻期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!",
+    "CZCE.LR": "晚籼稻期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!",
+}
+
+
+# offset_priority 中各字符对应的操作: 今=平今仓，昨=平昨仓，开=开仓，逗号=等待之前操作完成
+_OFFSET_TODAY, _OFFSET_HIS, _OFFSET_OPEN, _OFFSET_SYNC = 0, 1, 2, 3
+_OFFSET_PRIORITY_OPS = {"今": _OFFSET_TODAY, "昨": _OFFSET_HIS, "开": _OFFSET_OPEN, ",": _OFFSET_SYNC}
+
+
+# 下单方式为 "ACTIVE"/"PASSIVE" 时，按 (price, direction) 依次尝试的行情价格字段
+# 主动买的价格序列(优先判断卖价，如果没有则用买价)，都没有时依次使用最新价、昨收盘价
+_PRICE_FIELDS = {
+    ("ACTIVE", "BUY"): ("ask_price1", "bid_price1", "last_price", "pre_close"),
+    ("ACTIVE", "SELL"): ("bid_price1", "ask_price1", "last_price", "pre_close"),
+    ("PASSIVE", "BUY"): ("bid_price1", "ask_price1", "last_price", "pre_close"),
+    ("PASSIVE", "SELL"): ("ask_price1", "bid_price1", "last_price", "pre_close"),
+}
+
+
 class TargetPosTaskSingleton(type):
     """
     TargetPosTask 需要保证在每个账户下每个合约只有一个 TargetPosTask 实例。
@@ -40,17 +66,15 @@ class TargetPosTaskSingleton(type):
         target_account = api._account._check_valid(account)
         if target_account is None:
             raise Exception(f"多账户模式下, 需要指定账户实例 account")
-        key = api._account._get_account_key(target_account) + "#" + symbol
-        if key not in TargetPosTaskSingleton._instances:
-            TargetPosTaskSingleton._instances[key] = super(TargetPosTaskSingleton, cls).__call__(api, symbol, price,
-                                                                                                 offset_priority,
-                                                                                                 min_volume, max_volume,
-                                                                                                 trade_chan,
-                                                                                                 trade_objs_chan,
-                                                                                                 target_account,
-                                                                                                 *args, **kwargs)
+        # target_account 已经过 _check_valid 校验，直接读取其 _account_key
+        key = target_account._account_key + "#" + symbol
+        instance = TargetPosTaskSingleton._instances.get(key)
+        if instance is None:
+            instance = super(TargetPosTaskSingleton, cls).__call__(api, symbol, price, offset_priority, min_volume,
+                                                                   max_volume, trade_chan, trade_objs_chan,
+                                                                   target_account, *args, **kwargs)
+            TargetPosTaskSingleton._instances[key] = instance
         else:
-            instance = TargetPosTaskSingleton._instances[key]
             if instance._offset_priority != offset_priority:
                 raise Exception("您试图用不同的 offset_priority 参数创建两个 %s 调仓任务, offset_priority参数原为 %s, 现为 %s" % (
                     symbol, instance._offset_priority, offset_priority))
@@ -60,7 +84,7 @@ class TargetPosTaskSingleton(type):
                 raise Exception(f"您试图用不同的 min_volume 参数创建两个 {symbol} 调仓任务, min_volume 参数原为 {instance._min_volume}, 现为 {min_volume}")
             if instance._max_volume != max_volume:
                 raise Exception(f"您试图用不同的 max_volume 参数创建两个 {symbol} 调仓任务, max_volume 参数原为 {instance._max_volume}, 现为 {max_volume}")
-        return TargetPosTaskSingleton._instances[key]
+        return instance
 
 
 class TargetPosTask(object, metaclass=TargetPosTaskSingleton):
@@ -197,26 +221,17 @@ class TargetPosTask(object, metaclass=TargetPosTaskSingleton):
             # 2021-03-15 11:29:48 -     INFO - 时间: 2021-03-15 11:29:47.533515, 合约: SHFE.rb2106, 开平: OPEN, 方向: BUY, 手数: 3, 价格: 4687.000,手续费: 14.12
 
         """
-        if symbol.startswith("CZCE.CJ"):
-            raise Exception("红枣期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 4 手，这些函数还未支持该规则!")
-        if symbol.startswith("CZCE.ZC"):
-            raise Exception("动力煤期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 4 手，这些函数还未支持该规则!")
-        if symbol.startswith("CZCE.WH"):
-            raise Exception("强麦期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!")
-        if symbol.startswith("CZCE.PM"):
-            raise Exception("普麦期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!")
-        if symbol.startswith("CZCE.RI"):
-            raise Exception("早籼稻期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!")
-        if symbol.startswith("CZCE.JR"):
-            raise Exception("粳稻期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!")
-        if symbol.startswith("CZCE.LR"):
-            raise Exception("晚籼稻期货不支持创建 targetpostask、twap、vwap 任务，交易所规定该品种最小开仓手数为大于等于 10 手，这些函数还未支持该规则!")
+        unsupported_msg = _UNSUPPORTED_PRODUCTS.get(symbol[:7])
+        if unsupported_msg:
+            raise Exception(unsupported_msg)
         super(TargetPosTask, self).__init__()
         self._api = api
         self._account = api._account._check_valid(account)
         self._symbol = symbol
         self._exchange = symbol.split(".")[0]
         self._offset_priority = _check_offset_priority(offset_priority)
+        # 预先将 offset_priority 解析为操作序列，末尾追加一个等待操作，保证最后一组委托单完成
+        self._offset_priority_ops = tuple(_OFFSET_PRIORITY_OPS[c] for c in self._offset_priority) + (_OFFSET_SYNC,)
         self._min_volume, self._max_volume = _check_volume_limit(min_volume, max_volume)
         self._price = _check_price(price)
         self._pos = self._account.get_position(self._symbol)
@@ -227,6 +242,7 @@ class TargetPosTask(object, metaclass=TargetPosTaskSingleton):
         self._time_update_task = self._api.create_task(self._update_time_from_md())  # 监听行情更新并记录当时本地时间的task
         self._local_time_record = time.time() - 0.005  # 更新最新行情时间时的本地时间
         self._local_time_record_update_chan = TqChan(self._api, last_only=True)  # 监听 self._local_time_record 更新
+        self._local_time_record_waiting = False  # _target_pos_task 是否正在等待 self._local_time_record 更新
 
     def set_target_volume(self, volume: int) -> None:
         """
@@ -272,11 +288,28 @@ class TargetPosTask(object, metaclass=TargetPosTaskSingleton):
             raise Exception("已经结束的 TargetPosTask 实例不可以再设置手数。")
         self._pos_chan.send_nowait(int(volume))
 
-    def _get_order(self, offset, vol, pending_frozen):
+    def _get_frozen_volumes(self):
+        """
+        遍历一次该合约下的委托单，返回未完成平仓委托单按 (方向, offset) 统计的冻结手数
+        :return: dict, key 为 (order_dir, order_offset)，其中 (order_dir, None) 为该方向所有平仓委托单的冻结手数
+        """
+        frozen_volumes = {}
+        for order in self._pos.orders.values():
+            if order.is_dead or order.offset == "OPEN":
+                continue
+            key = (order.direction, order.offset)
+            frozen_volumes[key] = frozen_volumes.get(key, 0) + order.volume_left
+            key = (order.direction, None)
+            frozen_volumes[key] = frozen_volumes.get(key, 0) + order.volume_left
+        return frozen_volumes
+
+    def _get_order(self, offset_op, vol, pending_frozen, frozen_volumes):
         """
-        根据指定的offset和预期下单手数vol, 返回符合要求的委托单最大报单手数
-        :param offset: "昨" / "今" / "开"
+        根据指定的offset操作和预期下单手数vol, 返回符合要求的委托单最大报单手数
+        :param offset_op: _OFFSET_HIS(昨) / _OFFSET_TODAY(今) / _OFFSET_OPEN(开)
         :param vol: int, <0表示SELL, >0表示BUY
+        :param pending_frozen: int, 本轮已计划报出但还未发出的平仓手数
+        :param frozen_volumes: dict, _get_frozen_volumes 返回的未完成平仓委托单冻结手数，offset_op 为 _OFFSET_OPEN 时可以为 None
         :return: order_offset: "CLOSE"/"CLOSETODAY"/"OPEN"; order_dir: "BUY"/"SELL"; "order_volume": >=0, 报单手数
         """
         if vol > 0:  # 买单(增加净持仓)
@@ -285,38 +318,34 @@ class TargetPosTask(object, metaclass=TargetPosTaskSingleton):
         else:  # 卖单
             order_dir = "SELL"
             pos_all = self._pos.pos_long
-        if offset == "昨":
+        if offset_op == _OFFSET_HIS:
             order_offset = "CLOSE"
             if self._exchange == "SHFE" or self._exchange == "INE":
                 if vol > 0:
                     pos_all = self._pos.pos_short_his
                 else:
                     pos_all = self._pos.pos_long_his
-                frozen_volume = sum([order.volume_left for order in self._pos.orders.values() if
-                                     not order.is_dead and order.offset == order_offset and order.direction == order_dir])
+                frozen_volume = frozen_volumes.get((order_dir, order_offset), 0)
             else:
-                frozen_volume = pending_frozen + sum([order.volume_left for order in self._pos.orders.values() if
-                                                      not order.is_dead and order.offset != "OPEN" and order.direction == order_dir])
+                frozen_volume = pending_frozen + frozen_volumes.get((order_dir, None), 0)
                 # 判断是否有未冻结的今仓手数: 若有则不平昨仓
                 if (self._pos.pos_short_today if vol > 0 else self._pos.pos_long_today) - frozen_volume > 0:
                     pos_all = frozen_volume
             order_volume = min(abs(vol), max(0, pos_all - frozen_volume))
-        elif offset == "今":
+        elif offset_op == _OFFSET_TODAY:
             if self._exchange == "SHFE" or self._exchange == "INE":
                 order_offset = "CLOSETODAY"
                 if vol > 0:
                     pos_all = self._pos.pos_short_today
                 else:
                     pos_all = self._pos.pos_long_today
-                frozen_volume = sum([order.volume_left for order in self._pos.orders.values() if
-                                     not order.is_dead and order.offset == order_offset and order.direction == order_dir])
+                frozen_volume = frozen_volumes.get((order_dir, order_offset), 0)
             else:
                 order_offset = "CLOSE"
-                frozen_volume = pending_frozen + sum([order.volume_left for order in self._pos.orders.values() if
-                                                      not order.is_dead and order.offset != "OPEN" and order.direction == order_dir])
+                frozen_volume = pending_frozen + frozen_volumes.get((order_dir, None), 0)
                 pos_all = self._pos.pos_short_today if vol > 0 else self._pos.pos_long_today
             order_volume = min(abs(vol), max(0, pos_all - frozen_volume))
-        elif offset == "开":
+        elif offset_op == _OFFSET_OPEN:
             order_offset = "OPEN"
             order_volume = abs(vol)
         else:
@@ -335,7 +364,8 @@ class TargetPosTask(object, metaclass=TargetPosTaskSingleton):
                 self._api.register_update_notify(_get_obj(self._api._data, ["_tqsdk_backtest"]), chan)
             async for _ in chan:
                 self._local_time_record = time.time() - 0.005  # 更新最新行情时间时的本地时间
-                self._local_time_record_update_chan.send_nowait(True)  # 通知记录的时间有更新
+                if self._local_time_record_waiting:
+                    self._local_time_record_update_chan.send_nowait(True)  # 通知记录的时间有更新
         finally:
             await chan.close()
 
@@ -352,27 +382,34 @@ class TargetPosTask(object, metaclass=TargetPosTaskSingleton):
                 # 如果不在可交易时间段内（回测时用 backtest 下发的时间判断，实盘使用 quote 行情判断）: 等待更新
                 while True:
                     if isinstance(self._api._backtest, TqBacktest):
+                        # 回测时直接使用纳秒时间戳，不需要转换为字符串再解析
                         cur_timestamp = self._api._data.get("_tqsdk_backtest", {}).get("current_dt", float("nan"))
-                        cur_dt = _timestamp_nano_to_str(cur_timestamp)
                         time_record = float("nan")
                     else:
-                        cur_dt = self._quote["datetime"]
+                        cur_timestamp = _str_to_timestamp_nano(self._quote["datetime"])
                         time_record = self._local_time_record
-                    if _is_in_trading_time(self._quote, cur_dt, time_record):
+                    if _is_in_trading_time_by_nano(self._quote, cur_timestamp, time_record):
                         break
+                    self._local_time_record_waiting = True
                     await self._local_time_record_update_chan.recv()
+                    self._local_time_record_waiting = False
 
                 target_pos = self._pos_chan.recv_latest(target_pos)  # 获取最后一个target_pos目标仓位
                 # 确定调仓增减方向
                 delta_volume = target_pos - self._pos.pos
                 pending_forzen = 0
-                for each_priority in self._offset_priority + ",":  # 按不同模式的优先级顺序报出不同的offset单，股指(“昨开”)平昨优先从不平今就先报平昨，原油平今优先("今昨开")就报平今
-                    if each_priority == ",":
+                frozen_volumes = None  # 每组委托单中首个平仓操作前统计一次冻结手数，同组内委托单不会在此期间发出
+                for each_op in self._offset_priority_ops:  # 按不同模式的优先级顺序报出不同的offset单，股指(“昨开”)平昨优先从不平今就先报平昨，原油平今优先("今昨开")就报平今
+                    if each_op == _OFFSET_SYNC:
                         await gather(*[each._task for each in all_tasks])
                         pending_forzen = 0
+                        frozen_volumes = None
                         all_tasks = []
                         continue
-                    order_offset, order_dir, order_volume = self._get_order(each_priority, delta_volume, pending_forzen)
+                    if frozen_volumes is None and each_op != _OFFSET_OPEN:  # 开仓不需要冻结手数
+                        frozen_volumes = self._get_frozen_volumes()
+                    order_offset, order_dir, order_volume = self._get_order(each_op, delta_volume, pending_forzen,
+                                                                            frozen_volumes)
                     if order_volume == 0:  # 如果没有则直接到下一种offset
                         continue
                     elif order_offset != "OPEN":
@@ -486,7 +523,10 @@ class InsertOrderUntilAllTradedTask(object):
         self._offset = _check_offset(offset)
         self._volume = _check_volume(volume)
         self._min_volume, self._max_volume = _check_volume_limit(min_volume, max_volume)
+        # 大单拆分模式下随机手数的取值个数，每次下单手数为 min_volume + randrange(volume_range)
+        self._volume_range = self._max_volume - self._min_volume + 1 if self._min_volume and self._max_volume else 0
         self._price = _check_price(price)
+        self._price_fields = _PRICE_FIELDS.get((self._price, self._direction))  # price 为函数时为 None
         self._trade_chan = trade_chan
         self._trade_objs_chan = trade_objs_chan
         self._task = self._api.create_task(self._run())
@@ -495,12 +535,13 @@ class InsertOrderUntilAllTradedTask(object):
         """负责追价下单的task"""
         self._quote = await self._api.get_quote(self._symbol)
         while self._volume != 0:
-            limit_price = self._get_price(self._direction)
+            limit_price = self._get_price()
             if limit_price != limit_price:
                 raise Exception("设置价格函数返回 nan，无法处理。请检查后重试。")
             # 当前下单手数
-            if self._min_volume and self._max_volume and self._volume >= self._max_volume:
-                this_volume = utils.RD.randint(self._min_volume, self._max_volume)
+            if self._volume_range and self._volume >= self._max_volume:
+                # 与 randint(min_volume, max_volume) 等价；utils.RD 在 fork 后会重新初始化，因此不缓存其方法
+                this_volume = self._min_volume + utils.RD.randrange(self._volume_range)
             else:
                 this_volume = self._volume
             insert_order_task = InsertOrderTask(self._api, self._symbol, self._direction, self._offset,
@@ -520,7 +561,7 @@ class InsertOrderUntilAllTradedTask(object):
                     raise Exception("遇到错单: %s %s %s %d手 %f %s" % (
                         self._symbol, self._direction, self._offset, this_volume, limit_price, order['last_msg']))
             finally:
-                if self._api.get_order(order['order_id'], account=self._account).status == "ALIVE":
+                if insert_order_task._order.status == "ALIVE":
                     # 当 task 被 cancel 时，主动撤掉未成交的挂单
                     self._api.cancel_order(order['order_id'], account=self._account)
                 await check_chan.close()
@@ -534,33 +575,27 @@ class InsertOrderUntilAllTradedTask(object):
                     raise Exception(f"InsertOrderTask 执行超时，30s 内报单未执行完。此错误产生可能的原因："
                                     f"可能是用户调用了 api.close() 之后，已经创建的 InsertOrderTask 无法正常结束。")
 
-    def _get_price(self, direction):
-        """根据最新行情和下单方式计算出最优的下单价格"""
-        if self._price not in ('ACTIVE', 'PASSIVE'):
-            assert isfunction(self._price)
-            return self._price(direction)
-        # 主动买的价格序列(优先判断卖价，如果没有则用买价)
-        price_list = [self._quote.ask_price1, self._quote.bid_price1]
-        if direction == "SELL":
-            price_list.reverse()
-        if self._price == "PASSIVE":
-            price_list.reverse()
-        limit_price = price_list[0]
-        if limit_price != limit_price:
-            limit_price = price_list[1]
-        if limit_price != limit_price:
-            limit_price = self._quote.last_price
-        if limit_price != limit_price:
-            limit_price = self._quote.pre_close
+    def _get_price(self):
+        """根据最新行情、下单方式和本 task 的下单方向计算出最优的下单价格"""
+        if self._price_fields is None:
+            return self._price(self._direction)
+        # 依次使用预先确定的行情价格字段，直到取得非 nan 的价格
+        for field in self._price_fields:
+            limit_price = self._quote[field]
+            if limit_price == limit_price:
+                break
         return limit_price
 
     async def _check_price(self, update_chan, order_price, order_id):
         """判断价格是否变化的task"""
-        async with self._api.register_update_notify(chan=update_chan):
+        # "ACTIVE"/"PASSIVE" 下单价格只由该合约行情决定，只需监听 quote 更新；价格函数可能使用任意业务数据，需要监听所有更新
+        watched_obj = self._quote if self._price_fields is not None else None
+        is_buy = self._direction == "BUY"
+        get_price = self._get_price
+        async with self._api.register_update_notify(watched_obj, chan=update_chan):
             async for _ in update_chan:
-                new_price = self._get_price(self._direction)
-                if (self._direction == "BUY" and new_price > order_price) or (
-                        self._direction == "SELL" and new_price < order_price):
+                new_price = get_price()
+                if (is_buy and new_price > order_price) or (not is_buy and new_price < order_price):
                     self._api.cancel_order(order_id, account=self._account)
                     break
 
@@ -606,6 +641,7 @@ class InsertOrderTask(object):
         self._order_chan = order_chan if order_chan is not None else TqChan(self._api)
         self._trade_chan = trade_chan
         self._trade_objs_chan = trade_objs_chan
+        self._order = None  # 下单后为委托单对象的引用，在首次向 order_chan 发送委托单之前设置
         self._task = self._api.create_task(self._run())
 
     async def _run(self):
@@ -613,26 +649,33 @@ class InsertOrderTask(object):
         order_id = utils._generate_uuid("PYSDK_target")
         order = self._api.insert_order(self._symbol, self._direction, self._offset, self._volume, self._limit_price,
                                        order_id=order_id, account=self._account)
-        last_order = order.copy()  # 保存当前 order 的状态
+        self._order = order
+        last_order = dict(order)  # 保存当前 order 的状态，Entity 迭代时只包含不以 "_" 开头的字段
         last_left = self._volume
         all_trades_id = set()  # 记录所有的 trade_id
-        async with self._api.register_update_notify() as update_chan:
-            await self._order_chan.send({k: v for k, v in last_order.items() if not k.startswith("_")})  # 将副本的数据及所有权转移
-            while order.status != "FINISHED" or (order.volume_orign - order.volume_left) != sum(
-                    [trade.volume for trade in order.trade_records.values()]):
+        traded_volume = 0  # 已收到的成交记录的成交手数之和
+        # 只监听该委托单及其所属账户的成交记录，其他业务数据更新时不需要唤醒
+        trades = _get_obj(self._api._data, ["trade", order._path[1], "trades"])
+        async with self._api.register_update_notify([order, trades]) as update_chan:
+            await self._order_chan.send(last_order)  # 将副本的数据及所有权转移, 之后只读取 last_order 用于比较
+            while order.status != "FINISHED" or (order.volume_orign - order.volume_left) != traded_volume:
                 await update_chan.recv()
                 if order.volume_left != last_left:
                     vol = last_left - order.volume_left
                     last_left = order.volume_left
                     if self._trade_chan:
                         await self._trade_chan.send(vol if order.direction == "BUY" else -vol)
-                if self._trade_objs_chan:
-                    # 当前用户需要接受 trade_obj，才会运行以下代码
-                    rest_trades_id = set(order.trade_records) - all_trades_id
-                    for trade_id in rest_trades_id:
-                        # 新收到的 trade 发送到 self._trade_objs_chan
-                        await self._trade_objs_chan.send({k: v for k, v in order.trade_records[trade_id].items() if not k.startswith("_")})
+                # order.trade_records 每次都会遍历账户下所有成交记录，只在委托单已成交手数多于已收到的成交手数时才查找新成交
+                if (order.volume_orign - order.volume_left) != traded_volume:
+                    for trade_id, trade in order.trade_records.items():
+                        if trade_id in all_trades_id:
+                            continue
                         all_trades_id.add(trade_id)
-                if order != last_order:
-                    last_order = order.copy()
-                    await self._order_chan.send({k: v for k, v in last_order.items() if not k.startswith("_")})
+                        traded_volume += trade.volume
+                        if self._trade_objs_chan:
+                            # 新收到的 trade 发送到 self._trade_objs_chan
+                            await self._trade_objs_chan.send({k: v for k, v in trade.items() if not k.startswith("_")})
+                current_order = dict(order)
+                if current_order != last_order:
+                    last_order = current_order
+                    await self._order_chan.send(last_order)